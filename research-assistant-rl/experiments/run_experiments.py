@@ -169,16 +169,19 @@ def main():
     
     start_time = time.time()
     
-    baseline_results = run_random_baseline(env)
-    rl_results, coordinator = run_rl_training(env)
-    
-    elapsed_time = time.time() - start_time
-    
-    save_results(baseline_results, rl_results, coordinator, elapsed_time)
-    print_summary(baseline_results, rl_results, coordinator)
-    
-    print(f"\nTotal experiment time: {elapsed_time:.1f} seconds")
-    print(f"API usage: {env.toolkit.get_stats()}")
+    try:
+        baseline_results = run_random_baseline(env)
+        rl_results, coordinator = run_rl_training(env)
+        
+        elapsed_time = time.time() - start_time
+        
+        save_results(baseline_results, rl_results, coordinator, elapsed_time)
+        print_summary(baseline_results, rl_results, coordinator)
+        
+        print(f"\nTotal experiment time: {elapsed_time:.1f} seconds")
+        print(f"API usage: {env.toolkit.get_stats()}")
+    finally:
+        env.toolkit.close()
     
     print("\n✓ Experiments complete!")
     print("  Run analysis scripts for full validation")
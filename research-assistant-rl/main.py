@@ -1,6 +1,22 @@
 
 import sys
 import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+
+def run_stage(script, capture=False):
+    """Run an experiments/ script in a fresh interpreter"""
+    env = dict(os.environ, PYTHONIOENCODING='utf-8')
+    return subprocess.run(
+        [sys.executable, os.path.join('experiments', script)],
+        env=env,
+        capture_output=capture,
+        text=True,
+        encoding='utf-8',
+        errors='replace'
+    )
+
 
 print("\n" + "="*70)
 print("ADAPTIVE RESEARCH ASSISTANT - COMPLETE PIPELINE")
@@ -9,26 +25,33 @@ print("="*70)
 # Step 1: Run experiments
 print("\n" + "="*60)
 print("STEP 1: Running Experiments")
-print("="*60)
-os.system(f"{sys.executable} experiments\\run_experiments.py")
+print("="*60, flush=True)
+if run_stage('run_experiments.py').returncode != 0:
+    sys.exit("Experiments failed - skipping analysis")
 
-# Step 2: Analyze results
-print("\n" + "="*60)
-print("STEP 2: Analyzing Results")
-print("="*60)
-os.system(f"{sys.executable} experiments\\analyze_results.py")
+# Steps 2-4 only read experiment_data.json, so run them side by side.
+# Output is captured and printed per step to keep the log readable.
+stages = [
+    ("STEP 2: Analyzing Results", 'analyze_results.py'),
+    ("STEP 3: Statistical Validation", 'validation.py'),
+    ("STEP 4: Theoretical Analysis", 'theoretical_analysis.py'),
+]
+with ThreadPoolExecutor(max_workers=len(stages)) as executor:
+    results = list(executor.map(lambda s: run_stage(s[1], capture=True), stages))
 
-# Step 3: Statistical validation
-print("\n" + "="*60)
-print("STEP 3: Statistical Validation")
-print("="*60)
-os.system(f"{sys.executable} experiments\\validation.py")
+failed = []
+for (title, script), result in zip(stages, results):
+    print("\n" + "="*60)
+    print(title)
+    print("="*60)
+    print(result.stdout, end='')
+    print(result.stderr, end='')
+    if result.returncode != 0:
+        print(f"{script} exited with code {result.returncode}")
+        failed.append(script)
 
-# Step 4: Theoretical analysis
-print("\n" + "="*60)
-print("STEP 4: Theoretical Analysis")
-print("="*60)
-os.system(f"{sys.executable} experiments\\theoretical_analysis.py")
+if failed:
+    sys.exit(f"Analysis failed: {', '.join(failed)}")
 
 # Summary
 print("\n" + "="*70)
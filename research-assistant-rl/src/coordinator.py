@@ -1,6 +1,11 @@
 from src.agents import QueryStrategyAgent, SourceSelectorAgent
 from src.synthesis import PaperSynthesizer
-from collections import Counter
+from src.tools import SOURCES
+import numpy as np
+
+
+# Index of each allocation in EnhancedCoordinator.allocation_counts
+ALLOCATIONS = {'q_agent': 0, 'ucb_agent': 1, 'both': 2}
 
 
 class EnhancedCoordinator:
@@ -17,12 +22,13 @@ class EnhancedCoordinator:
         self.ucb_agent = SourceSelectorAgent()
         self.synthesizer = PaperSynthesizer()
         
-        # Task allocation tracking
-        self.task_allocation_history = {
-            'q_agent': 0, 
-            'ucb_agent': 0, 
-            'both': 0
-        }
+        # Task allocation tracking, indexed by ALLOCATIONS
+        self.allocation_counts = np.zeros(len(ALLOCATIONS), dtype=np.int64)
+    
+    @property
+    def task_allocation_history(self):
+        """Task allocation counts by agent"""
+        return {name: int(self.allocation_counts[i]) for name, i in ALLOCATIONS.items()}
     
     def allocate_task(self, task):
         """
@@ -31,21 +37,21 @@ class EnhancedCoordinator:
         """
         # Early episodes: both agents work on all tasks
         if self.q_agent.episode_count < 50:
-            self.task_allocation_history['both'] += 1
+            self.allocation_counts[ALLOCATIONS['both']] += 1
             return 'both'
         
         # Later: specialize based on task difficulty
         if task.difficulty == 'easy':
             # UCB alone sufficient for easy tasks
-            self.task_allocation_history['ucb_agent'] += 1
+            self.allocation_counts[ALLOCATIONS['ucb_agent']] += 1
             return 'ucb_agent'
         elif task.difficulty == 'hard':
             # Q-Learning better for complex strategy decisions
-            self.task_allocation_history['q_agent'] += 1
+            self.allocation_counts[ALLOCATIONS['q_agent']] += 1
             return 'q_agent'
         else:
             # Both agents for medium difficulty
-            self.task_allocation_history['both'] += 1
+            self.allocation_counts[ALLOCATIONS['both']] += 1
             return 'both'
     
     def agent_voting(self, state, topic):
@@ -63,9 +69,9 @@ class EnhancedCoordinator:
         ucb_source = self.ucb_agent.choose_source(topic)
         votes['ucb_agent'] = ucb_source
         
-        # Majority voting (communication protocol)
-        vote_counts = Counter(votes.values())
-        winning_source = vote_counts.most_common(1)[0][0]
+        # Majority voting (communication protocol). With two voters either
+        # both agree or the vote is tied, and ties go to the first voter
+        winning_source = q_source
         
         return winning_source, q_strategy, votes
     
@@ -74,11 +80,13 @@ class EnhancedCoordinator:
         Execute research with comprehensive fallback strategy.
         
         Fallback chain:
-        1. Try primary source
-        2. If fails, try alternative source
-        3. If still fails, return penalty
+        1. Serve from cache if the chosen source already has results
+        2. Otherwise query primary, starting the alternative source if it is slow
+        3. Use the primary's papers if it returns any, else the alternative's
+        4. If both fail, return penalty
         """
         state = self.q_agent.get_state(task)
+        topic = task.topic
         
         # Dynamic task allocation
         allocation = self.allocate_task(task)
@@ -87,39 +95,33 @@ class EnhancedCoordinator:
         if allocation == 'ucb_agent':
             # UCB only (for easy tasks)
             strategy = 'specific'  # Default strategy
-            source = self.ucb_agent.choose_source(task.topic)
+            source = self.ucb_agent.choose_source(topic)
         elif allocation == 'q_agent':
             # Q-Learning only (for hard tasks)
             strategy, source = self.q_agent.choose_action(state)
         else:
             # Both agents: use voting (for medium tasks)
-            source, strategy, votes = self.agent_voting(state, task.topic)
-        
-        # Execute search with fallback
-        papers = None
-        sources_tried = [source]
+            source, strategy, votes = self.agent_voting(state, topic)
         
-        try:
-            papers, cost = env.execute_search(strategy, source)
-            
-            # Fallback if no papers retrieved
-            if not papers or len(papers) == 0:
-                raise ValueError("No papers retrieved")
-                
-        except Exception as e:
-            # Fallback to alternative source
+        # Fast path: results already cached for the chosen source need no
+        # network round trip and no backup search
+        primary_source = source
+        cached = env.execute_cached_search(strategy, source)
+        fast_path = cached is not None
+        if fast_path:
+            papers, cost = cached
+            sources_tried = [source]
+            env.toolkit.call_count[SOURCES[source]] += 1
+        else:
+            # Execute search, with the alternative source as a hedged fallback
             backup_source = 'arxiv' if source == 'openalex' else 'openalex'
-            sources_tried.append(backup_source)
-            
-            try:
-                papers, cost = env.execute_search(strategy, backup_source)
-                source = backup_source  # Update to actual source used
-            except Exception:
-                # Final fallback: return empty with penalty
-                papers, cost = [], 5.0
+            papers, cost, source, sources_tried = env.toolkit.run(
+                env.execute_search_raced(strategy, primary_source, backup_source)
+            )
         
         # Synthesize papers
         synthesis_result = self.synthesizer.synthesize(papers, task.query_terms)
+        relevance = task.evaluate_results(papers) if papers else 0
         
         # Calculate reward
         if papers:
@@ -134,18 +136,19 @@ class EnhancedCoordinator:
         if allocation in ['q_agent', 'both']:
             self.q_agent.update(state, (strategy, source), total_reward, next_state)
         if allocation in ['ucb_agent', 'both']:
-            self.ucb_agent.update(task.topic, source, total_reward)
+            self.ucb_agent.update(topic, source, total_reward)
         
         return papers, total_reward, {
             'strategy': strategy,
             'source': source,
             'cost': cost,
-            'relevance': task.evaluate_results(papers) if papers else 0,
+            'relevance': relevance,
             'papers_count': len(papers),
             'synthesis': synthesis_result['synthesis'],
             'synthesis_quality': synthesis_result['quality'],
             'new_terms': synthesis_result['new_terms_discovered'],
             'allocation': allocation,
             'sources_tried': sources_tried,
-            'fallback_used': len(sources_tried) > 1
+            'fallback_used': len(sources_tried) > 1,
+            'fast_path': fast_path
         }
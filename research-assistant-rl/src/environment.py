@@ -1,5 +1,6 @@
+import asyncio
 import random
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from src.tools import ResearchToolkit
 from src.utils import calculate_relevance_score
 
@@ -119,12 +120,44 @@ class ResearchEnvironment:
         Returns:
             (papers, cost) where cost represents time/effort
         """
+        return self.toolkit.run(self.execute_search_async(query_strategy, source, limit))
+    
+    async def execute_search_async(self, 
+                                   query_strategy: str, 
+                                   source: str, 
+                                   limit: int = 10) -> Tuple[List[Dict], float]:
+        """Coroutine version of execute_search()"""
+        if not self.current_task:
+            raise ValueError("No active task")
+        
+        query = self._build_query(self.current_task.query_terms, query_strategy)
+        papers = await self.toolkit.search_async(query, source, limit)
+        return self._score_search(papers, query_strategy)
+    
+    def execute_cached_search(self, 
+                              query_strategy: str, 
+                              source: str, 
+                              limit: int = 10) -> Optional[Tuple[List[Dict], float]]:
+        """
+        Serve a search from the toolkit's caches only.
+        
+        Returns:
+            (papers, cost) like execute_search(), or None if the results
+            are not cached and would need a network request
+        """
         if not self.current_task:
             raise ValueError("No active task")
         
         query = self._build_query(self.current_task.query_terms, query_strategy)
-        papers = self.toolkit.search(query, source, limit)
+        papers = self.toolkit.get_cached(query, source, limit)
+        if papers is None:
+            return None
         
+        papers, cost = self._score_search(papers, query_strategy)
+        return (papers, cost) if papers else None
+    
+    def _score_search(self, papers: List[Dict], query_strategy: str) -> Tuple[List[Dict], float]:
+        """Drop empty papers and calculate the cost of a search"""
         # Filter out papers with no content (FIX APPLIED)
         papers = [p for p in papers if p.get('title') or p.get('abstract')]
         
@@ -138,6 +171,58 @@ class ResearchEnvironment:
         
         return papers, cost
     
+    async def execute_search_raced(self, 
+                                   query_strategy: str, 
+                                   primary: str, 
+                                   backup: str, 
+                                   limit: int = 10,
+                                   hedge_delay: float = 2.0) -> Tuple[List[Dict], float, str, List[str]]:
+        """
+        Search the primary source, hedging with the backup if it is slow.
+        The backup is only started once the primary has run for hedge_delay
+        seconds or has failed, so fast successful searches cost one request.
+        The primary's papers are used whenever it returns any; the backup's
+        result is only used if the primary comes back empty or fails.
+        
+        Returns:
+            (papers, cost, source, sources_tried)
+        """
+        primary_task = asyncio.ensure_future(self.execute_search_async(query_strategy, primary, limit))
+        backup_task = None
+        sources_tried = [primary]
+        
+        try:
+            papers = []
+            try:
+                papers, cost = await asyncio.wait_for(asyncio.shield(primary_task), hedge_delay)
+            except asyncio.TimeoutError:
+                # Primary is slow: start the backup while still waiting on it
+                backup_task = asyncio.ensure_future(self.execute_search_async(query_strategy, backup, limit))
+                try:
+                    papers, cost = await primary_task
+                except Exception:
+                    pass
+            except Exception:
+                pass
+            
+            if papers:
+                return papers, cost, primary, sources_tried
+            
+            # Fallback to alternative source
+            sources_tried.append(backup)
+            if backup_task is None:
+                backup_task = asyncio.ensure_future(self.execute_search_async(query_strategy, backup, limit))
+            try:
+                papers, cost = await backup_task
+                return papers, cost, backup, sources_tried
+            except Exception:
+                # Final fallback: return empty with penalty
+                return [], 5.0, primary, sources_tried
+        finally:
+            if backup_task is not None and not backup_task.done():
+                backup_task.cancel()
+                await asyncio.gather(backup_task, return_exceptions=True)
+    
     def _build_query(self, terms: List[str], strategy: str) -> str:
         """Construct query string based on search strategy"""
         if strategy == 'broad':
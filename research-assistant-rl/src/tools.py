@@ -1,44 +1,107 @@
 
-import requests
 import arxiv
-import time
-import hashlib
-import json
+import asyncio
+import httpx
+import numpy as np
+import orjson
 import os
-from typing import List, Dict
-from src.utils import rate_limit
+import sqlite3
+import xxhash
+import zstandard as zstd
+from cachetools import TTLCache
+from collections import OrderedDict
+from operator import itemgetter
+from typing import List, Dict, Tuple
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+from src.utils import AsyncRateLimiter
+
+
+# Index of each source in the toolkit's counter arrays
+SOURCES = {'openalex': 0, 'arxiv': 1}
+
+# Fields read from every OpenAlex work, fetched in one call
+_WORK_FIELDS = ('title', 'publication_year', 'cited_by_count', 'authorships',
+                'id', 'display_name', 'abstract_inverted_index')
+_WORK_DEFAULTS = ('No title', 0, 0, [], '', 'No abstract available', None)
+_get_work_fields = itemgetter(*_WORK_FIELDS)
+
+
+def _get_work_fields_safe(work):
+    """Fallback for works missing some fields"""
+    return tuple(work.get(k, d) for k, d in zip(_WORK_FIELDS, _WORK_DEFAULTS))
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Timeouts, connection errors, 429 and 5xx responses are worth retrying"""
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+# Cache payloads smaller than this are stored as plain JSON. Compressed
+# blobs are recognised on read by the zstd frame magic number.
+COMPRESS_MIN_BYTES = 512
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+_compressor = zstd.ZstdCompressor(level=3)
+_decompressor = zstd.ZstdDecompressor()
 
 
 class CachedAPI:
-    """Base class with caching functionality"""
+    """
+    Base class with caching functionality.
+    All API clients share one SQLite key-value store (WAL mode);
+    empty results are remembered in memory for a few minutes.
+    """
+    
+    cache_path = 'results/cache/api.db'
+    _conn = None
     
     def __init__(self):
-        self.cache_dir = 'results/cache/api'
-        os.makedirs(self.cache_dir, exist_ok=True)
+        self.conn = CachedAPI.get_connection()
+        # Queries that recently came back empty, so retries are skipped
+        self.empty_cache = TTLCache(maxsize=10000, ttl=600)
+    
+    @classmethod
+    def get_connection(cls) -> sqlite3.Connection:
+        """Open the shared cache database once per process"""
+        if cls._conn is None:
+            os.makedirs(os.path.dirname(cls.cache_path), exist_ok=True)
+            conn = sqlite3.connect(cls.cache_path, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, val BLOB)")
+            cls._conn = conn
+        return cls._conn
     
     def get_cache_key(self, query, source):
         """Generate cache key from query"""
         key_str = f"{source}_{query}".encode('utf-8')
-        return hashlib.md5(key_str).hexdigest()
+        return xxhash.xxh3_64_hexdigest(key_str)
     
     def get_cached(self, cache_key):
         """Retrieve from cache"""
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r') as f:
-                    return json.load(f)
-            except:
+        try:
+            row = self.conn.execute("SELECT val FROM cache WHERE key=?", (cache_key,)).fetchone()
+            if not row:
                 return None
-        return None
+            blob = row[0]
+            if blob[:4] == ZSTD_MAGIC:
+                blob = _decompressor.decompress(blob)
+            return orjson.loads(blob)
+        except (sqlite3.Error, orjson.JSONDecodeError, zstd.ZstdError):
+            return None
     
     def save_cache(self, cache_key, data):
-        """Save to cache"""
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
+        """Save to cache, zstd-compressing payloads above COMPRESS_MIN_BYTES"""
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(data, f)
-        except:
+            blob = orjson.dumps(data)
+            if len(blob) >= COMPRESS_MIN_BYTES:
+                blob = _compressor.compress(blob)
+            self.conn.execute("INSERT OR REPLACE INTO cache (key, val) VALUES (?, ?)",
+                              (cache_key, blob))
+        except (sqlite3.Error, orjson.JSONEncodeError, zstd.ZstdError):
             pass
 
 
@@ -49,15 +112,36 @@ class OpenAlexAPI(CachedAPI):
     No API key required. Much better than OpenAlex.
     """
     
-    def __init__(self):
+    def __init__(self, limiter: AsyncRateLimiter = None):
         super().__init__()
         self.base_url = "https://api.openalex.org/works"
-        self.session = requests.Session()
-        # Polite pool: identify yourself
-        self.session.headers.update({'User-Agent': 'mailto:your.email@example.com'})
+        # 10 requests/second, shared by all concurrent searches
+        self.limiter = limiter or AsyncRateLimiter(10, 1)
+        # HTTP/2 client kept open for the process lifetime, so concurrent
+        # queries multiplex over a single TLS connection
+        # (asyncio already sets TCP_NODELAY on its sockets)
+        self.session = httpx.AsyncClient(
+            http2=True,
+            timeout=10,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+            # Polite pool: identify yourself
+            headers={'User-Agent': 'mailto:your.email@example.com'}
+        )
+    
+    async def preconnect(self):
+        """Open the connection up front so DNS + TLS stay out of the first search"""
+        try:
+            # Counts against the same budget as real searches
+            async with self.limiter:
+                await self.session.head(self.base_url, timeout=5)
+        except httpx.HTTPError:
+            pass
+    
+    async def close(self):
+        """Close the HTTP client"""
+        await self.session.aclose()
     
-    @rate_limit(max_per_minute=100)  # 10/sec = 600/min, use 100 to be polite
-    def search_papers(self, query: str, limit: int = 10) -> List[Dict]:
+    async def search_papers(self, query: str, limit: int = 10) -> List[Dict]:
         """
         Search OpenAlex for papers.
         
@@ -70,97 +154,98 @@ class OpenAlexAPI(CachedAPI):
         """
         # Check cache
         cache_key = self.get_cache_key(query, 'openalex')
+        if cache_key in self.empty_cache:
+            return []
         cached = self.get_cached(cache_key)
         if cached:
             return cached
         
+        papers = await self._search_remote(query, limit)
+        
+        # Cache result
+        if papers:
+            self.save_cache(cache_key, papers)
+        else:
+            self.empty_cache[cache_key] = True
+        return papers
+    
+    async def _search_remote(self, query: str, limit: int) -> List[Dict]:
+        """Query the OpenAlex API, returning [] once retries are exhausted"""
         params = {
             'search': query,
             'per_page': min(limit, 200),  # OpenAlex max is 200
             'sort': 'cited_by_count:desc'
         }
         
-        # Retry logic
-        max_retries = 3
-        for attempt in range(max_retries):
+        try:
+            data = await self._get_works(params)
+        except httpx.HTTPStatusError as e:
+            print(f"OpenAlex error: {e.response.status_code}")
+            return []
+        except Exception as e:
+            print(f"OpenAlex error: {e}")
+            return []
+        
+        results = data.get('results', [])
+        
+        # Convert to standard format
+        papers = []
+        for work in results:
             try:
-                response = self.session.get(self.base_url, params=params, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    results = data.get('results', [])
-                    
-                    # Convert to standard format
-                    papers = []
-                    for work in results:
-                        # Extract abstract (can be in multiple places)
-                        abstract = None
-                        if work.get('abstract_inverted_index'):
-                            # Reconstruct abstract from inverted index
-                            inv_index = work['abstract_inverted_index']
-                            words = [''] * (max(max(positions) for positions in inv_index.values()) + 1)
-                            for word, positions in inv_index.items():
-                                for pos in positions:
-                                    words[pos] = word
-                            abstract = ' '.join(words)
-                        
-                        papers.append({
-                            'title': work.get('title', 'No title'),
-                            'abstract': abstract or work.get('display_name', 'No abstract available'),
-                            'year': work.get('publication_year', 0),
-                            'citationCount': work.get('cited_by_count', 0),
-                            'authors': [{'name': a.get('author', {}).get('display_name', 'Unknown')} 
-                                       for a in work.get('authorships', [])],
-                            'url': work.get('id', '')
-                        })
-                    
-                    # Cache result
-                    self.save_cache(cache_key, papers)
-                    return papers
-                
-                elif response.status_code == 429:
-                    # Rate limited (rare with OpenAlex)
-                    time.sleep(5)
-                    continue
-                
-                elif response.status_code >= 500:
-                    if attempt < max_retries - 1:
-                        time.sleep(2 * (attempt + 1))
-                        continue
-                    return []
-                
-                else:
-                    print(f"OpenAlex error: {response.status_code}")
-                    return []
-                    
-            except requests.exceptions.Timeout:
-                if attempt < max_retries - 1:
-                    time.sleep(2 * (attempt + 1))
-                    continue
-                return []
+                (title, year, citations, authorships,
+                 url, display_name, inv_index) = _get_work_fields(work)
+            except KeyError:
+                (title, year, citations, authorships,
+                 url, display_name, inv_index) = _get_work_fields_safe(work)
+            
+            # Extract abstract (can be in multiple places)
+            abstract = None
+            if inv_index:
+                # Reconstruct abstract from inverted index
+                pairs = [(pos, word) for word, positions in inv_index.items()
+                         for pos in positions]
+                pairs.sort()
+                abstract = ' '.join([word for _, word in pairs])
             
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    time.sleep(2 * (attempt + 1))
-                    continue
-                print(f"OpenAlex error: {e}")
-                return []
+            papers.append({
+                'title': title,
+                'abstract': abstract or display_name,
+                'year': year,
+                'citationCount': citations,
+                'authors': [a.get('author', {}).get('display_name', 'Unknown')
+                            for a in authorships or ()],
+                'url': url
+            })
         
-        return []
+        return papers
+    
+    @retry(stop=stop_after_attempt(3),
+           wait=wait_exponential_jitter(initial=1, max=10),
+           retry=retry_if_exception(_is_retryable),
+           reraise=True)
+    async def _get_works(self, params: Dict) -> Dict:
+        """GET the works endpoint; raises on non-2xx responses"""
+        async with self.limiter:
+            response = await self.session.get(self.base_url, params=params)
+        response.raise_for_status()
+        return orjson.loads(response.content)
 
 
 class ArxivAPI(CachedAPI):
     """arXiv API client with caching"""
     
-    def __init__(self):
+    def __init__(self, limiter: AsyncRateLimiter = None):
         super().__init__()
         self.client = arxiv.Client()
+        # arXiv asks for at most one request every 3 seconds
+        self.limiter = limiter or AsyncRateLimiter(1, 3)
     
-    @rate_limit(max_per_minute=20)
-    def search_papers(self, query: str, limit: int = 10) -> List[Dict]:
+    async def search_papers(self, query: str, limit: int = 10) -> List[Dict]:
         """Search arXiv with caching"""
         
         cache_key = self.get_cache_key(query, 'arxiv')
+        if cache_key in self.empty_cache:
+            return []
         cached = self.get_cached(cache_key)
         if cached:
             return cached
@@ -171,37 +256,79 @@ class ArxivAPI(CachedAPI):
             sort_by=arxiv.SortCriterion.Relevance
         )
         
+        # Once the request is sent it is shielded: if this search is
+        # cancelled (e.g. an unneeded backup) the response is still cached
+        async with self.limiter:
+            return await asyncio.shield(self._fetch_and_cache(search, cache_key))
+    
+    async def _fetch_and_cache(self, search, cache_key) -> List[Dict]:
+        """Fetch off the event loop and cache the result"""
         papers = []
         try:
-            for result in self.client.results(search):
-                papers.append({
-                    'title': result.title,
-                    'abstract': result.summary,
-                    'year': result.published.year,
-                    'authors': [{'name': a.name} for a in result.authors],
-                    'url': result.entry_id,
-                    'citationCount': 0
-                })
+            # The arxiv client is blocking; run it off the event loop
+            loop = asyncio.get_running_loop()
+            papers = await loop.run_in_executor(None, self._fetch, search)
             
             self.save_cache(cache_key, papers)
                 
         except Exception as e:
             print(f"arXiv error: {e}")
         
+        if not papers:
+            self.empty_cache[cache_key] = True
+        return papers
+    
+    def _fetch(self, search) -> List[Dict]:
+        """Run a blocking arXiv search and convert to standard format"""
+        papers = []
+        for result in self.client.results(search):
+            papers.append({
+                'title': result.title,
+                'abstract': result.summary,
+                'year': result.published.year,
+                'authors': [a.name for a in result.authors],
+                'url': result.entry_id,
+                'citationCount': 0
+            })
         return papers
 
 
 class ResearchToolkit:
     """
     Unified interface to research APIs.
-    Uses OpenAlex (no rate limiting) + arXiv.
+    Uses OpenAlex + arXiv, with one shared rate limiter per API host.
     """
     
-    def __init__(self):
-        self.openalex = OpenAlexAPI()
-        self.arxiv = ArxivAPI()
-        self.call_count = {'openalex': 0, 'arxiv': 0}
-        self.failure_count = {'openalex': 0, 'arxiv': 0}
+    def __init__(self, max_concurrency: int = 10, memo_size: int = 4096):
+        self.limiters = {
+            'openalex': AsyncRateLimiter(10, 1),
+            'arxiv': AsyncRateLimiter(1, 3)
+        }
+        self.openalex = OpenAlexAPI(self.limiters['openalex'])
+        self.arxiv = ArxivAPI(self.limiters['arxiv'])
+        # Per-source counters, indexed by SOURCES
+        self.call_count = np.zeros(len(SOURCES), dtype=np.int64)
+        self.failure_count = np.zeros(len(SOURCES), dtype=np.int64)
+        
+        # In-process LRU of recent results, keyed by (source, query, limit)
+        self.memo = OrderedDict()
+        self.memo_size = memo_size
+        
+        # One long-lived loop so HTTP sessions survive across episodes
+        self.loop = asyncio.new_event_loop()
+        self.max_concurrency = max_concurrency
+        self.semaphores = {}
+        self.run(self.openalex.preconnect())
+    
+    def get_semaphore(self, source: str) -> asyncio.Semaphore:
+        """Per-source concurrency cap, created inside the running loop"""
+        if source not in self.semaphores:
+            self.semaphores[source] = asyncio.Semaphore(self.max_concurrency)
+        return self.semaphores[source]
+    
+    def run(self, coro):
+        """Run a coroutine to completion on the toolkit's event loop"""
+        return self.loop.run_until_complete(coro)
     
     def search(self, query: str, source: str, limit: int = 10) -> List[Dict]:
         """
@@ -215,35 +342,103 @@ class ResearchToolkit:
         Returns:
             List of paper dictionaries
         """
-        self.call_count[source] = self.call_count.get(source, 0) + 1
+        return self.run(self.search_async(query, source, limit))
+    
+    async def search_async(self, query: str, source: str, limit: int = 10) -> List[Dict]:
+        """Coroutine version of search()"""
+        if source not in SOURCES:
+            print(f"Unknown source: {source}")
+            return []
+        idx = SOURCES[source]
+        
+        memo_key = (source, query, limit)
+        if memo_key in self.memo:
+            self.memo.move_to_end(memo_key)
+            self.call_count[idx] += 1
+            return self.memo[memo_key]
         
         try:
             if source == 'openalex':
-                papers = self.openalex.search_papers(query, limit)
+                async with self.get_semaphore(source):
+                    papers = await self.openalex.search_papers(query, limit)
             elif source == 'arxiv':
-                papers = self.arxiv.search_papers(query, limit)
-            else:
-                print(f"Unknown source: {source}")
-                papers = []
-            
-            if not papers:
-                self.failure_count[source] = self.failure_count.get(source, 0) + 1
-            
-            return papers
-        
+                async with self.get_semaphore(source):
+                    papers = await self.arxiv.search_papers(query, limit)
         except Exception as e:
             print(f"Search error for {source}: {e}")
-            self.failure_count[source] = self.failure_count.get(source, 0) + 1
-            return []
+            papers = []
+        
+        # Counted only once the search completes, so cancelled searches
+        # do not show up as calls
+        self.call_count[idx] += 1
+        if not papers:
+            self.failure_count[idx] += 1
+        else:
+            self._remember(memo_key, papers)
+        
+        return papers
+    
+    def get_cached(self, query: str, source: str, limit: int = 10):
+        """
+        Return results already held in memory or in the disk cache,
+        without any network I/O. Returns None on a miss.
+        Does not touch call_count; callers count the lookups they serve.
+        """
+        memo_key = (source, query, limit)
+        if memo_key in self.memo:
+            self.memo.move_to_end(memo_key)
+            papers = self.memo[memo_key]
+        else:
+            api = {'openalex': self.openalex, 'arxiv': self.arxiv}.get(source)
+            if api is None:
+                return None
+            papers = api.get_cached(api.get_cache_key(query, source))
+            if not papers:
+                return None
+            self._remember(memo_key, papers)
+        
+        return papers
+    
+    def _remember(self, memo_key, papers):
+        """Insert into the in-process LRU, evicting the oldest entry"""
+        self.memo[memo_key] = papers
+        if len(self.memo) > self.memo_size:
+            self.memo.popitem(last=False)
+    
+    async def search_many(self, queries: List[Tuple[str, str]], limit: int = 10) -> List[List[Dict]]:
+        """
+        Run several searches concurrently.
+        
+        Args:
+            queries: List of (query, source) pairs
+            limit: Max papers to return per query
+        
+        Returns:
+            List of paper lists, in the same order as queries
+        """
+        return await asyncio.gather(*(
+            self.search_async(query, source, limit) for query, source in queries
+        ))
+    
+    def close(self):
+        """Release HTTP sessions and the event loop"""
+        if self.loop.is_closed():
+            return
+        try:
+            # Let shielded fetches from cancelled searches finish and cache
+            pending = asyncio.all_tasks(self.loop)
+            if pending:
+                self.run(asyncio.gather(*pending, return_exceptions=True))
+            self.run(self.openalex.close())
+        finally:
+            self.loop.close()
     
     def get_stats(self) -> Dict:
         """Return API usage statistics"""
+        success_rate = 1 - self.failure_count / np.maximum(1, self.call_count)
         return {
-            'total_calls': sum(self.call_count.values()),
-            'by_source': self.call_count.copy(),
-            'failures': self.failure_count.copy(),
-            'success_rate': {
-                src: 1 - (self.failure_count.get(src, 0) / max(1, self.call_count.get(src, 1)))
-                for src in self.call_count.keys()
-            }
+            'total_calls': int(self.call_count.sum()),
+            'by_source': {src: int(self.call_count[i]) for src, i in SOURCES.items()},
+            'failures': {src: int(self.failure_count[i]) for src, i in SOURCES.items()},
+            'success_rate': {src: float(success_rate[i]) for src, i in SOURCES.items()}
         }
@@ -1,29 +1,46 @@
+import asyncio
 import time
 import json
 import os
-from functools import wraps
 
 
-def rate_limit(max_per_minute):
+class AsyncRateLimiter:
     """
-    Decorator to rate limit API calls.
-    Ensures we don't exceed API limits.
+    Leaky-bucket rate limiter shared by concurrent coroutines.
+    Allows at most max_rate acquisitions per time_period seconds and
+    waits with asyncio.sleep, so the event loop is never blocked.
+    
+    Usage:
+        async with limiter:
+            ...
     """
-    min_interval = 60.0 / max_per_minute
-    last_called = [0.0]
-    
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            elapsed = time.time() - last_called[0]
-            left_to_wait = min_interval - elapsed
-            if left_to_wait > 0:
-                time.sleep(left_to_wait)
-            ret = func(*args, **kwargs)
-            last_called[0] = time.time()
-            return ret
-        return wrapper
-    return decorator
+    
+    def __init__(self, max_rate, time_period=1.0):
+        self.max_rate = max_rate
+        self.rate_per_sec = max_rate / time_period
+        self.level = 0.0
+        self.last_check = time.monotonic()
+    
+    def _leak(self):
+        """Drain the bucket for the time elapsed since the last check"""
+        now = time.monotonic()
+        self.level = max(0.0, self.level - (now - self.last_check) * self.rate_per_sec)
+        self.last_check = now
+    
+    async def acquire(self):
+        """Wait until a request fits in the bucket, then take its slot"""
+        while True:
+            self._leak()
+            if self.level + 1 <= self.max_rate:
+                self.level += 1
+                return
+            await asyncio.sleep((self.level + 1 - self.max_rate) / self.rate_per_sec)
+    
+    async def __aenter__(self):
+        await self.acquire()
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
 
 
 def calculate_relevance_score(paper, query_terms):